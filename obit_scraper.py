@@ -1,135 +1,839 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import xml.etree.ElementTree as ET
-import time
-import requests
-from bs4 import BeautifulSoup
+from lxml import etree as ET
+import asyncio
+from collections import Counter, defaultdict, deque
+from contextlib import asynccontextmanager
+import logging
+from logging.handlers import QueueHandler
+import queue
+import threading
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+from concurrent.futures import ProcessPoolExecutor
+import html
+from html.entities import html5
+import json
+import multiprocessing
 import os
+import re
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+log = logging.getLogger(__name__)
+
+# Format used for both the console and the GUI log box
+LOG_FORMAT = "[%(levelname)s] %(message)s"
+
+# Maximum number of obituary pages fetched at the same time
+MAX_CONCURRENCY = 10
+
+# How many children of <channel> are read ahead of the one being written.
+# Their fetches run meanwhile, so it needs to be a few times MAX_CONCURRENCY;
+# it is also what bounds memory, whatever the size of the feed.
+FEED_WINDOW = 4 * MAX_CONCURRENCY
+
+# Connection pool for the shared client. Obituary links almost always point
+# at one host, so keeping every connection alive lets requests after the
+# first skip the TCP + TLS handshake (or share one HTTP/2 connection).
+POOL_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=20
+)
+
+# Per-request timeout (seconds), set once on the client
+REQUEST_TIMEOUT = 10.0
+
+# Also dump the start of every fetched page when logging at DEBUG level (very noisy)
+DEBUG = False
+
+# "Are you human?" challenge marker, matched against the raw response bytes
+HUMAN_RE = re.compile(rb'are you human', re.I)
+
+# How far into the page to look for the challenge marker
+HUMAN_CHECK_BYTES = 2048
+
+# CSS selectors used by parse_obit_html, kept as constants so each block type
+# maps to exactly one css_first() lookup
+BLOCK_SELECTOR = 'div[data-blog-component]'
+SUBTITLE_SELECTOR = 'h3'
+IMAGE_SELECTOR = 'img'
+TEXT_SELECTOR = 'div[data-blog-inner=text]'
+
+# Patterns for the regex fast path in parse_obit_html, compiled once at import.
+# They only cover the obituary CMS's fixed markup; anything else falls back
+# to the full Lexbor parser. Tag names match case-insensitively like HTML's,
+# and quoted attribute values are skipped whole so a '>' inside one doesn't
+# end the tag.
+_ATTRS = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+_ATTRS_LAZY = _ATTRS + '?'
+# Matched against the lower-cased page (cheaper than re.I over the whole
+# page); the captured type is then read back from the original text
+BLOCK_START_RE = re.compile(
+    r'<div\b' + _ATTRS_LAZY + r'\sdata-blog-component="([^"]*)"' + _ATTRS + '>'
+)
+TEXT_INNER_RE = re.compile(
+    r'<div\b' + _ATTRS_LAZY + r'\sdata-blog-inner="(?-i:text)"' + _ATTRS + '>', re.I
+)
+DIV_OPEN_RE = re.compile(r'<div\b', re.I)
+DIV_CLOSE_RE = re.compile(r'</div\s*>', re.I)
+H3_OPEN_RE = re.compile(r'<h3\b', re.I)
+H3_RE = re.compile(r'<h3\b' + _ATTRS + r'>(.*?)</h3\s*>', re.I | re.DOTALL)
+IMG_OPEN_RE = re.compile(r'<img\b', re.I)
+IMG_TAG_RE = re.compile(r'<img\b(' + _ATTRS + ')>', re.I)
+ATTR_RE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+# A character reference the way html.unescape finds it: numeric, or a run of
+# name characters with an optional ';'
+CHARREF_RE = re.compile(r'&(#[0-9]+;?|#[xX][0-9a-fA-F]+;?|[^\t\n\f <&#;]{1,32};?)')
+TAG_RE = re.compile(r'<(/?)([a-zA-Z][^\s/>]*)(' + _ATTRS + ')>')
+# Elements whose content isn't parsed as markup (a '<div' inside a script is just text)
+RAW_TEXT_TAGS = ('script', 'style', 'textarea', 'title', 'template', 'noscript', 'xmp')
+RAW_OPEN_RE = re.compile(r'<(?:' + '|'.join(RAW_TEXT_TAGS) + r')\b', re.I)
+
+# Tags the text-block balance check (_check_balanced) handles
+VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'source', 'track', 'wbr'
+))
+# Tags the HTML parser may restructure (foster parenting, raw text, forms...)
+UNSAFE_TAGS = frozenset((
+    'script', 'style', 'textarea', 'title', 'template', 'noscript', 'xmp', 'iframe',
+    'noembed', 'noframes', 'plaintext', 'table', 'caption', 'colgroup', 'tbody',
+    'thead', 'tfoot', 'tr', 'td', 'th', 'select', 'option', 'optgroup', 'form',
+    'button', 'svg', 'math', 'html', 'head', 'body', 'frameset', 'frame', 'image'
+))
+# Start tags that implicitly close an open <p>
+CLOSES_P_TAGS = frozenset((
+    'address', 'article', 'aside', 'blockquote', 'details', 'dialog', 'dir', 'div',
+    'dl', 'dd', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'header', 'hgroup', 'hr', 'li', 'main', 'menu', 'nav',
+    'ol', 'p', 'pre', 'section', 'ul'
+))
+HEADING_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+
+# Sidecar file mapping url -> {"etag", "last_modified", "html"} so re-runs can
+# send conditional GETs and skip pages that haven't changed
+CACHE_FILE = "obit_cache.json"
+
+# Characters XML 1.0 doesn't allow (control characters, lone surrogates...);
+# lxml refuses to store text containing any of them
+XML_INVALID_RE = re.compile('[^\t\n\r\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]')
+
+def load_cache(cache_file):
+    """Load the conditional-GET cache, or return an empty one if it's missing/corrupt."""
+    if not os.path.exists(cache_file):
+        return {}
 
-def fetch_obit_content(url, user_agent):
+    try:
+        with open(cache_file, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("Could not read cache '%s', starting fresh: %s", cache_file, e)
+        return {}
+
+def save_cache(cache_file, cache):
+    """Write the conditional-GET cache back to disk."""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        log.warning("Could not write cache '%s': %s", cache_file, e)
+
+def normalize_url(url):
+    """Normalize a link for de-duplication: drop the #fragment and lower-case the scheme/host."""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+
+def _handle_subtitle(div):
+    """data-blog-component="subtitle": keep the <h3> text."""
+    h3 = div.css_first(SUBTITLE_SELECTOR)
+    if h3:
+        return f"<h3>{h3.text(strip=True)}</h3>"
+    return None
+
+def _handle_image(div):
+    """data-blog-component="image": keep the <img> source."""
+    img_tag = div.css_first(IMAGE_SELECTOR)
+    image_src = img_tag.attrs.get('src') if img_tag else None
+    if image_src:
+        return f'<img src="{image_src}" alt="obit image" />'
+    return None
+
+def _handle_text(div):
+    """data-blog-component="text": keep the inner text <div> as HTML."""
+    text_div = div.css_first(TEXT_SELECTOR)
+    if text_div:
+        # .html is serialized by Lexbor's C serializer in a single call,
+        # with no Python-level walk over the subtree
+        return text_div.html
+    return None
+
+# data-blog-component type -> handler returning that block's HTML (or None).
+# Block types without a handler are skipped.
+HANDLERS = {
+    'subtitle': _handle_subtitle,
+    'image': _handle_image,
+    'text': _handle_text,
+}
+
+class _LayoutMismatch(Exception):
+    """Raised by the fast-path handlers when a block doesn't look like the CMS's markup."""
+
+def _block_head(region):
     """
-    Fetches obituary content from the given URL using the specified User-Agent.
-    
-    1. Fetch the webpage at 'url' with requests, using a custom User-Agent.
-    2. If the HTML contains "are you human", return None (signal to stop).
-    3. Otherwise, extract relevant obituary text/HTML from <div data-blog-component="...">.
+    Return the markup of a block up to its closing </div>.
+
+    'region' starts right after the block's opening tag. Raises
+    _LayoutMismatch if the block has nested <div>s (the first </div> then
+    isn't the block's own) or anything the parser would read differently.
     """
-    
-    headers = {
-        "User-Agent": user_agent
-    }
+    close = DIV_CLOSE_RE.search(region)
+    if close is None:
+        raise _LayoutMismatch
+    head = region[:close.start()]
+    if DIV_OPEN_RE.search(head) or RAW_OPEN_RE.search(head) or '<!' in head:
+        raise _LayoutMismatch
+    return head
+
+def _unescape_attr_ref(m):
+    """CHARREF_RE callback: decode one reference the way HTML does inside an attribute."""
+    ref = m.group(1)
+    if ref[0] == '#' or (ref.endswith(';') and ref in html5):
+        return html.unescape(m.group(0))
+
+    # The longest entity name 'ref' starts with; names that can end without
+    # a ';' (like "copy") are the legacy ones
+    for end in range(len(ref), 1, -1):
+        if ref[:end] in html5:
+            break
+    else:
+        return m.group(0)
+    # Unlike in text, a legacy name directly followed by a letter, digit or
+    # '=' isn't a reference at all, so "?a=1&copy=2" keeps its "&copy"
+    following = ref[end:end + 1] or m.string[m.end():m.end() + 1]
+    if following == '=' or (following.isascii() and following.isalnum()):
+        return m.group(0)
+    return html.unescape(m.group(0))
+
+def _unescape_attr(value):
+    """html.unescape for attribute values, which keep some legacy entities as written."""
+    if '&' not in value:
+        return value
+    return CHARREF_RE.sub(_unescape_attr_ref, value)
+
+def _tag_attr(attrs, name):
+    """Return the first value of attribute 'name' in a start tag's attribute text, or None."""
+    for m in ATTR_RE.finditer(attrs):
+        if m.group(1).lower() == name:
+            value = next((v for v in m.group(2, 3, 4) if v is not None), '')
+            return _unescape_attr(value)
+    return None
+
+def _check_balanced(body):
+    """
+    Raise _LayoutMismatch unless the parser would keep 'body' exactly as nested.
 
-    try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-    except requests.RequestException as e:
-        print(f"[ERROR] Fetching {url} failed: {e}")
-        return ""  # Return empty if there's a network/HTTP error
+    Every tag must be explicitly closed in order, with nothing the HTML
+    tree builder would move, close implicitly or treat as raw text.
+    """
+    stack = []
+    pos = 0
+    for m in TAG_RE.finditer(body):
+        if '<' in body[pos:m.start()]:
+            raise _LayoutMismatch  # a '<' that isn't a plain tag (comment, stray '<'...)
+        pos = m.end()
+
+        name = m.group(2).lower()
+        if name in UNSAFE_TAGS:
+            raise _LayoutMismatch
+        if m.group(1):
+            if not stack or stack.pop() != name:
+                raise _LayoutMismatch
+            continue
+        if name in VOID_TAGS:
+            continue
+        if (m.group(3).endswith('/')
+                or (name in CLOSES_P_TAGS and 'p' in stack)
+                or (name in HEADING_TAGS and not HEADING_TAGS.isdisjoint(stack))
+                or (name == 'a' and 'a' in stack)):
+            raise _LayoutMismatch
+        stack.append(name)
+
+    if stack or '<' in body[pos:]:
+        raise _LayoutMismatch
+
+def _fast_subtitle(region):
+    """Regex version of _handle_subtitle."""
+    head = _block_head(region)
+    opening = H3_OPEN_RE.search(head)
+    if opening is None:
+        return None
+    m = H3_RE.match(head, opening.start())
+    if m is None or '<' in m.group(1):
+        raise _LayoutMismatch  # odd <h3> or markup inside it, let Lexbor extract the text
+    return f"<h3>{html.unescape(m.group(1)).strip()}</h3>"
+
+def _fast_image(region):
+    """Regex version of _handle_image."""
+    head = _block_head(region)
+    opening = IMG_OPEN_RE.search(head)
+    if opening is None:
+        return None
+    tag = IMG_TAG_RE.match(head, opening.start())
+    if tag is None:
+        raise _LayoutMismatch
+    image_src = _tag_attr(tag.group(1), 'src')
+    if image_src:
+        return f'<img src="{image_src}" alt="obit image" />'
+    return None
+
+def _fast_text(region):
+    """Regex version of _handle_text; returns the inner text <div> sliced from the source."""
+    close = DIV_CLOSE_RE.search(region)
+    if close is None:
+        raise _LayoutMismatch
+    inner = TEXT_INNER_RE.search(region, 0, close.start())
+    if inner is None:
+        _block_head(region)  # raises if the block has a <div> we couldn't match
+        return None
+    # The inner <div> must be the block's first <div> and contain none itself,
+    # so the first </div> closes it
+    prefix = region[:inner.start()]
+    if DIV_OPEN_RE.search(prefix) or RAW_OPEN_RE.search(prefix) or '<!' in prefix:
+        raise _LayoutMismatch
+    _check_balanced(region[inner.end():close.start()])
+    return region[inner.start():close.end()]
+
+# Fast-path counterparts of HANDLERS; each takes the markup following the
+# block's opening tag
+FAST_HANDLERS = {
+    'subtitle': _fast_subtitle,
+    'image': _fast_image,
+    'text': _fast_text,
+}
+
+def _block_in_raw_text(lowered):
+    """Return True if a data-blog-component mention sits inside a <script> or similar."""
+    for tag in RAW_TEXT_TAGS:
+        start = lowered.find('<' + tag)
+        while start != -1:
+            end = lowered.find('</' + tag, start)
+            if end == -1:
+                end = len(lowered)
+            if lowered.find('data-blog-component', start, end) != -1:
+                return True
+            start = lowered.find('<' + tag, end)
+    return False
+
+def _parse_obit_html_fast(text):
+    """
+    Extract the obituary blocks with plain regexes, without building a DOM.
 
-    print(f"  [DEBUG] Fetched {url} with status code: {resp.status_code}")
-    sample_html = resp.text[:500].lower()
-    print("  [DEBUG] First 500 characters of HTML:\n", resp.text[:500], "\n-----")
+    Blocks are found in document order by their opening tags; each block's
+    markup runs up to the next block. Returns None when the page doesn't
+    match the known layout (comments, a block the regexes can't see, nested
+    <div>s, unbalanced markup...), in which case the caller uses the full parser.
+    """
+    # Commented-out markup would be picked up by the regexes
+    if '<!--' in text:
+        return None
+
+    lowered = text.lower()
+    # Offsets found in 'lowered' are reused on 'text', so they must line up
+    if len(lowered) != len(text):
+        return None
+
+    starts = list(BLOCK_START_RE.finditer(lowered))
+    # Every mention of the attribute must be a block we matched, otherwise
+    # some block is written in a way the regexes don't handle...
+    if len(starts) != lowered.count('data-blog-component'):
+        return None
+    # ...and none of them may sit inside a <script> or similar
+    if _block_in_raw_text(lowered):
+        return None
 
-    # Detect "are you human" challenge
-    if "are you human" in sample_html:
-        print("[ERROR] 'Are you human?' captcha detected.")
-        return None  # None signals we should stop processing further
+    combined_html = []
+    try:
+        for i, m in enumerate(starts):
+            handler = FAST_HANDLERS.get(_unescape_attr(text[m.start(1):m.end(1)]))
+            if handler:
+                end = starts[i + 1].start() if i + 1 < len(starts) else len(text)
+                block_html = handler(text[m.end():end])
+                if block_html:
+                    combined_html.append(block_html)
+    except _LayoutMismatch:
+        return None
+
+    return "\n".join(combined_html)
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
-    content_divs = soup.find_all('div', attrs={'data-blog-component': True})
-    print(f"  [DEBUG] Found {len(content_divs)} 'data-blog-component' blocks")
+def _parse_obit_html_lexbor(text):
+    """Extract the obituary blocks from a full Lexbor DOM; works on any markup."""
+    tree = LexborHTMLParser(text)
+    content_divs = tree.css(BLOCK_SELECTOR)
+    log.debug("  Found %d 'data-blog-component' blocks", len(content_divs))
 
     combined_html = []
     for div in content_divs:
-        comp_type = div.get('data-blog-component', 'unknown')
-        print(f"    [DEBUG] Handling data-blog-component={comp_type}")
-
-        if comp_type == 'subtitle':
-            h3 = div.find('h3')
-            if h3:
-                combined_html.append(f"<h3>{h3.get_text(strip=True)}</h3>")
-        elif comp_type == 'image':
-            img_tag = div.find('img')
-            if img_tag and img_tag.get('src'):
-                image_src = img_tag['src']
-                combined_html.append(f'<img src="{image_src}" alt="obit image" />')
-        elif comp_type == 'text':
-            text_div = div.find('div', attrs={'data-blog-inner': 'text'})
-            if text_div:
-                block_html = str(text_div)
+        # .attrs reads straight from the node; .attributes would build a dict
+        comp_type = div.attrs.get('data-blog-component') or 'unknown'
+        log.debug("    Handling data-blog-component=%s", comp_type)
+
+        handler = HANDLERS.get(comp_type)
+        if handler:
+            block_html = handler(div)
+            if block_html:
                 combined_html.append(block_html)
 
     return "\n".join(combined_html)
 
-def scrape_rss_feed(input_file, output_file, delay, user_agent):
+async def parse_obit_html(text, executor):
+    """
+    Extracts relevant obituary text/HTML from <div data-blog-component="...">.
+
+    Runs the regex fast path right here (handing it to a worker would cost
+    more than the parse) and only sends pages that don't match the CMS's
+    known layout to _parse_obit_html_lexbor in 'executor', so that parse
+    runs on another core while the event loop keeps fetching. 'executor'
+    may be None for the loop's default thread pool.
+    Returns the combined HTML as a string.
+    """
+    obit_html = _parse_obit_html_fast(text)
+    if obit_html is not None:
+        return obit_html
+
+    log.debug("  Page doesn't match the known layout, using the full parser")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_obit_html_lexbor, text)
+
+class TokenBucket:
+    """
+    Spaces requests to one host at most 'rate' per second.
+
+    Unlike a fixed sleep after every request, time a slow response already
+    took counts towards the gap, so the next request can go out immediately.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.next = time.monotonic()
+        # Held by the one request to this host that is taking its turn (see request_slot)
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        """Sleep until this caller's turn; turns are handed out in call order."""
+        now = time.monotonic()
+        # Reserve the slot before sleeping so concurrent callers queue up
+        # behind each other instead of all waking at the same moment
+        slot = max(self.next, now)
+        self.next = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+@asynccontextmanager
+async def request_slot(sem, bucket):
+    """
+    Hold a 'sem' slot for one request, taking the host's 'bucket' turn only after the slot is held.
+
+    Reserving the turn first let requests whose turns had passed while they
+    queued on 'sem' all go out together. Only the request holding the
+    bucket's lock waits on 'sem' and the bucket, so a slow host ties up at
+    most one slot while its other requests queue on the lock.
+    """
+    async with bucket.lock:
+        await sem.acquire()
+        try:
+            await bucket.wait()
+        except BaseException:
+            sem.release()
+            raise
+    try:
+        yield
+    finally:
+        sem.release()
+
+async def fetch_obit_content(client, url, sem, buckets, stop_event, cache, process_pool):
+    """
+    Fetches obituary content from the given URL using the shared httpx client.
+    
+    1. Wait for a free slot on 'sem' so at most MAX_CONCURRENCY pages are in
+       flight, then for the TokenBucket in 'buckets' for the URL's host (see
+       request_slot).
+    2. Fetch the webpage at 'url' (the client already carries the User-Agent),
+       sending If-None-Match / If-Modified-Since when 'cache' has an entry for it.
+       On 304 Not Modified, return the cached HTML without re-parsing.
+    3. If the HTML contains "are you human", set 'stop_event' and return None (signal to stop).
+    4. Otherwise, extract the blocks with parse_obit_html, whose full-parser
+       fallback runs in 'process_pool'. Remember the result in 'cache' along
+       with the response's validators.
+    """
+
+    async with request_slot(sem, buckets[urlsplit(url).netloc]):
+        # Another page already tripped the captcha, don't bother fetching
+        if stop_event.is_set():
+            return None
+
+        headers = {}
+        cached = cache.get(url)
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            resp = await client.get(url, headers=headers)
+            if cached and resp.status_code == 304:
+                log.debug("  %s not modified, using cached content", url)
+                return cached['html']
+            resp.raise_for_status()
+        except httpx.HTTPError as e:
+            log.error("Fetching %s failed: %s", url, e)
+            return ""  # Return empty if there's a network/HTTP error
+
+        log.debug("  Fetched %s with status code: %d", url, resp.status_code)
+        if DEBUG:
+            log.debug("  First 500 characters of HTML:\n%s\n-----", resp.text[:500])
+
+        # Detect "are you human" challenge on the raw bytes, so a captcha
+        # page is never decoded at all. endpos limits the search without
+        # slicing or lower-casing a copy of the body.
+        if HUMAN_RE.search(resp.content, 0, HUMAN_CHECK_BYTES):
+            log.error("'Are you human?' captcha detected.")
+            stop_event.set()
+            return None  # None signals we should stop processing further
+
+        obit_html = await parse_obit_html(resp.text, process_pool)
+
+        etag = resp.headers.get('ETag')
+        last_modified = resp.headers.get('Last-Modified')
+        if etag or last_modified:
+            cache[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "html": obit_html
+            }
+
+    return obit_html
+
+def set_description(item, obit_html):
+    """
+    Store obit_html in item's <description> (created if missing) as CDATA.
+
+    Characters XML can't hold, like a form feed pasted into the CMS, are
+    dropped first; lxml would otherwise raise and lose the item.
+    """
+    desc_elem = item.find('description')
+    if desc_elem is None:
+        desc_elem = ET.SubElement(item, 'description')
+
+    obit_html = XML_INVALID_RE.sub('', obit_html)
+    # A real CDATA section; assigning the literal "<![CDATA[" text got it
+    # escaped on write
+    if ']]>' in obit_html:
+        desc_elem.text = obit_html  # can't be wrapped, let lxml escape it
+    else:
+        desc_elem.text = ET.CDATA(obit_html)
+
+def iter_rss(input_file):
+    """
+    Lazily walk input_file with iterparse, yielding (kind, node) pairs in feed order.
+
+    - ('rss', elem) / ('channel', elem): <rss> / its <channel> has started
+      (and its .text is complete)
+    - ('node', node): a finished element, comment or PI directly inside
+      <rss>, <channel> or the document itself
+    - ('end', elem): <channel> / <rss> has ended
+
+    A node's tail is only complete once the next pair has been read.
+    Nodes stay in the parser's tree until the consumer calls discard(node),
+    so memory is bounded by what the consumer holds on to.
     """
-    1. Parse RSS feed from input_file.
+    root = None
+    channel = None
+    opened = None
+
+    for event, node in ET.iterparse(input_file, events=('start', 'end', 'comment', 'pi')):
+        # An element's text is only parsed by the time the next event fires
+        if opened is not None:
+            yield opened
+            opened = None
+
+        parent = node.getparent()
+        if event == 'start':
+            if root is None:
+                root = node
+                opened = ('rss', node)
+            elif channel is None and parent is root and node.tag == 'channel':
+                channel = node
+                opened = ('channel', node)
+        elif node is root or node is channel:
+            yield 'end', node
+        elif parent is None or parent is root or parent is channel:
+            yield 'node', node
+
+def discard(node):
+    """Free a node from iter_rss once it has been written out."""
+    parent = node.getparent()
+    if parent is not None:
+        parent.remove(node)
+
+def read_rss_head(events):
+    """
+    Read iter_rss(...) pairs up to and including the feed's <channel>.
+
+    Returns (prolog, root, before_channel, channel): the comments / PIs ahead
+    of <rss>, <rss> itself, its children ahead of <channel>, and <channel>,
+    which is None if <rss> ends without one.
+    """
+    prolog = []
+    root = None
+    before_channel = []
+
+    for kind, node in events:
+        if kind == 'rss':
+            root = node
+        elif kind == 'channel':
+            return prolog, root, before_channel, node
+        elif kind == 'end':
+            break
+        elif root is None:
+            prolog.append(node)
+        else:
+            before_channel.append(node)
+
+    return prolog, root, before_channel, None
+
+async def write_rss_feed(output_file, events, head, fetch):
+    """
+    Write the feed to output_file incrementally with lxml's xmlfile writer.
+
+    'events' is the iter_rss(...) generator read_rss_head returned 'head'
+    from. Children of <channel> are read at most FEED_WINDOW ahead of the
+    one being written: every <item>'s fetch (the coroutine fetch(url))
+    starts as soon as it is read, and items are written in feed order once
+    their fetch has finished and its result is in their <description>.
+    Items linking to a page whose fetch is still in the window share it.
+    Each item is flushed and discarded once written, so memory stays
+    bounded by the window and a crash only loses the unfinished items.
+    After an 'Are you human?' hit, the rest of the feed is written unchanged.
+    Returns (number of <item>s, number of them whose fetch was shared).
+    """
+    prolog, root, before_channel, channel = head
+    pending = deque()  # (node, (i, url, title) or None), read but not written yet
+    tasks = {}         # url -> fetch task, for the URLs of the pending items
+    users = Counter()  # url -> how many pending items are waiting on tasks[url]
+    stopped = False
+    items = 0
+    shared = 0
+
+    def read(node):
+        nonlocal items, shared
+        job = None
+        if node.tag == 'item':
+            items += 1
+            link_elem = node.find('link')
+            if link_elem is None:
+                log.warning("Item %d has no <link>, skipping...", items)
+            elif not stopped:
+                # Normalized so duplicate links share a single fetch
+                url = normalize_url(link_elem.text.strip())
+                title_elem = node.find('title')
+                title_text = title_elem.text.strip() if title_elem is not None else "No Title"
+                if url in tasks:
+                    shared += 1
+                else:
+                    tasks[url] = asyncio.ensure_future(fetch(url))
+                users[url] += 1
+                job = (items, url, title_text)
+        pending.append((node, job))
+
+    async def write_next(xf):
+        nonlocal stopped
+        node, job = pending.popleft()
+        if job is not None and not stopped:
+            i, url, title_text = job
+            log.info("Processing item %d - %s | %s", i, title_text, url)
+
+            task = tasks[url]
+            users[url] -= 1
+            if not users[url]:
+                del tasks[url], users[url]
+            try:
+                obit_html = await task
+            except Exception as e:
+                log.error("Fetching %s failed: %s", url, e)
+                obit_html = ""
+
+            # If obit_html is None, "Are you human?" was triggered
+            if obit_html is None:
+                log.info("'Are you human?' triggered on item %d with title '%s'. Stopping script.",
+                         i, title_text)
+                stopped = True
+            else:
+                # Otherwise, store in <description>
+                set_description(node, obit_html)
+
+        xf.write(node)
+        xf.flush()
+        discard(node)
+
+    try:
+        with ET.xmlfile(output_file, encoding='utf-8') as xf:
+            xf.write_declaration()
+            for node in prolog:
+                xf.write(node)
+            with xf.element(root.tag, root.attrib, nsmap=root.nsmap):
+                if root.text:
+                    xf.write(root.text)
+                for node in before_channel:
+                    xf.write(node)
+                    discard(node)
+
+                with xf.element(channel.tag, channel.attrib):
+                    if channel.text:
+                        xf.write(channel.text)
+                    try:
+                        for kind, node in events:
+                            if kind == 'end':
+                                break
+                            read(node)
+                            # The oldest node's tail is complete now that a later one was read
+                            if len(pending) > FEED_WINDOW:
+                                await write_next(xf)
+                    except ET.ParseError:
+                        # The items read before the error are whole, write them out too
+                        while pending:
+                            await write_next(xf)
+                        raise
+                    while pending:
+                        await write_next(xf)
+
+                # Hold the rest of <rss> until it ends, so <channel>'s tail is complete
+                after_channel = []
+                for kind, node in events:
+                    if kind == 'end':
+                        break
+                    after_channel.append(node)
+                if channel.tail:
+                    xf.write(channel.tail)
+                for node in after_channel:
+                    xf.write(node)
+
+        # xmlfile can't write past the root element, so comments / PIs after
+        # </rss> are appended to the finished file
+        epilog = [node for _, node in events]
+        if epilog:
+            with open(output_file, 'ab') as f:
+                for node in epilog:
+                    f.write(b'\n' + ET.tostring(node, encoding='utf-8'))
+    finally:
+        # Don't leave fetches running (or un-awaited) if writing stops early
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    return items, shared
+
+async def scrape_rss_feed_async(input_file, output_file, rate, user_agent):
+    """
+    1. Stream the RSS feed from input_file (see iter_rss).
     2. For each <item>, read <link> to get the obituary page URL.
-    3. Scrape the page for relevant data:
+    3. Scrape the pages of the items read ahead concurrently (bounded by
+       MAX_CONCURRENCY) for relevant data:
+       - At most 'rate' requests per second go to any one host.
        - If 'Are you human?' is detected, stop immediately.
-    4. Put data into <description>.
-    5. Save the updated feed to output_file.
+    4. Put the data into each <item>'s <description> and stream the items to
+       output_file in feed order (see write_rss_feed).
     """
 
-    print(f"[INFO] Parsing RSS feed: {input_file}")
+    log.info("Parsing RSS feed: %s", input_file)
     
     # Simple sanity check to see if file exists
     if not os.path.exists(input_file):
-        print(f"[ERROR] The file '{input_file}' does not exist.")
+        log.error("The file '%s' does not exist.", input_file)
         return
 
+    events = iter_rss(input_file)
     try:
-        tree = ET.parse(input_file)
-        root = tree.getroot()
+        head = read_rss_head(events)
     except ET.ParseError as e:
-        print(f"[ERROR] Failed to parse the RSS feed: {e}")
+        log.error("Failed to parse the RSS feed: %s", e)
         return
 
-    channel = root.find('channel')
-    if channel is None:
-        print(f"[ERROR] No <channel> found in {input_file}.")
+    if head[3] is None:
+        log.error("No <channel> found in %s.", input_file)
         return
 
-    items = channel.findall('item')
-    print(f"[INFO] Found {len(items)} <item> entries in {input_file}.\n")
-    
-    for i, item in enumerate(items, start=1):
-        link_elem = item.find('link')
-        if link_elem is None:
-            print(f"[WARN] Item {i}/{len(items)} has no <link>, skipping...")
-            continue
+    log.info("Fetching pages up to %d at a time...", MAX_CONCURRENCY)
+
+    cache = load_cache(CACHE_FILE)
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    buckets = defaultdict(lambda: TokenBucket(rate))
+    stop_event = asyncio.Event()
+    # httpx already sends Accept-Encoding for every codec it can decode
+    # (gzip/deflate, plus br when brotli is installed), so only the
+    # User-Agent needs setting here.
+    client = httpx.AsyncClient(
+        headers={"User-Agent": user_agent},
+        http2=True,
+        limits=POOL_LIMITS,
+        timeout=REQUEST_TIMEOUT,
+        # requests followed redirects by default; httpx doesn't
+        follow_redirects=True
+    )
+    # "spawn" rather than the default fork: forking from this worker thread of
+    # a multi-threaded Tk process can copy a lock another thread holds (e.g. a
+    # logging handler's) and deadlock the child. Workers are only started
+    # once a page actually needs the full parser.
+    process_pool = ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        async with client:
+            items, shared = await write_rss_feed(
+                output_file, events, head,
+                lambda url: fetch_obit_content(client, url, sem, buckets, stop_event, cache, process_pool)
+            )
+    except ET.ParseError as e:
+        # Everything before the error has already been written
+        log.error("Failed to parse the RSS feed: %s. '%s' is incomplete.", e, output_file)
+    else:
+        log.info("Processed %d <item> entries in %s.", items, input_file)
+        if shared:
+            log.info("Skipped %d duplicate links.", shared)
+        log.info("Done! Updated RSS feed saved to '%s'.", output_file)
+    finally:
+        process_pool.shutdown()
 
-        url = link_elem.text.strip()
-        title_elem = item.find('title')
-        title_text = title_elem.text.strip() if title_elem is not None else "No Title"
-        
-        print(f"[INFO] Processing item {i}/{len(items)} - {title_text} | {url}")
-        
-        obit_html = fetch_obit_content(url, user_agent)
-
-        # If obit_html is None, "Are you human?" was triggered
-        if obit_html is None:
-            print(f"[INFO] 'Are you human?' triggered on item {i} with title '{title_text}'. Stopping script.")
-            break
-        
-        # Otherwise, store in <description>
-        desc_elem = item.find('description')
-        if desc_elem is None:
-            desc_elem = ET.SubElement(item, 'description')
-        
-        desc_elem.text = f"<![CDATA[\n{obit_html}\n]]>"
-
-        # Delay between scraping each item
-        print(f"[INFO] Waiting {delay} seconds before next item...\n")
-        time.sleep(delay)
-    
-    # Write the updated RSS feed
-    tree.write(output_file, encoding='utf-8', xml_declaration=True)
-    print(f"\n[INFO] Done! Updated RSS feed saved to '{output_file}'.")
+    save_cache(CACHE_FILE, cache)
+
+def scrape_rss_feed(input_file, output_file, rate, user_agent):
+    """Synchronous entry point: runs scrape_rss_feed_async on a fresh event loop."""
+    asyncio.run(scrape_rss_feed_async(input_file, output_file, rate, user_agent))
 
 
 # ------------------- TKINTER GUI -------------------
 
+# Posted on the log queue by the worker thread once scraping has finished,
+# or instead of SCRAPE_DONE if it stopped with an exception
+SCRAPE_DONE = object()
+SCRAPE_FAILED = object()
+
+def run_scraper(log_queue, input_file, output_file, rate, user_agent):
+    """
+    Worker thread body: run scrape_rss_feed, then post SCRAPE_DONE on
+    log_queue so the GUI knows it has finished. If it raises, the traceback
+    is logged (so it shows up in the log box) and SCRAPE_FAILED is posted.
+    """
+    try:
+        scrape_rss_feed(input_file, output_file, rate, user_agent)
+    except Exception:
+        log.exception("Scraping failed")
+        log_queue.put(SCRAPE_FAILED)
+    else:
+        log_queue.put(SCRAPE_DONE)
+
 def browse_input_file():
     """Open a file dialog to select the input RSS file."""
     filename = filedialog.askopenfilename(
@@ -154,23 +858,63 @@ def start_scraping():
     input_file = input_file_var.get().strip()
     output_file = output_file_var.get().strip()
     
-    # Validate delay
+    # Validate rate
     try:
-        delay = float(delay_var.get())
-        if delay < 0:
+        rate = float(rate_var.get())
+        if rate <= 0:
             raise ValueError
     except ValueError:
-        messagebox.showerror("Invalid Delay", "Please enter a valid non-negative number for delay.")
+        messagebox.showerror("Invalid Rate", "Please enter a valid positive number for the request rate.")
         return
 
     user_agent = user_agent_var.get().strip()
     if not user_agent:
         messagebox.showwarning("Empty User-Agent", "User-Agent is empty. You might get blocked by the website.")
 
-    # Run the scraping in the same thread (simplest approach).
-    # For large RSS feeds or long tasks, consider using threading or multiprocessing.
-    scrape_rss_feed(input_file, output_file, delay, user_agent)
-    messagebox.showinfo("Done", f"Scraping completed. Updated feed saved to:\n{output_file}")
+    # Run the scraping in a worker thread so the window keeps redrawing.
+    # Tk isn't thread-safe, so the worker only talks to the GUI through
+    # log_queue, which the main loop drains every 100 ms.
+    log_queue = queue.Queue()
+    # The root logger stays at WARNING so httpx/asyncio internals don't flood
+    # the log box; only the scraper's own logger follows the checkbox.
+    logging.basicConfig(
+        format=LOG_FORMAT,
+        handlers=[logging.StreamHandler(), QueueHandler(log_queue)],
+        force=True
+    )
+    log.setLevel(logging.DEBUG if verbose_var.get() else logging.INFO)
+    worker = threading.Thread(
+        target=run_scraper,
+        args=(log_queue, input_file, output_file, rate, user_agent),
+        daemon=True
+    )
+    txt_log.delete('1.0', tk.END)
+    btn_start.config(state=tk.DISABLED)
+    worker.start()
+    root.after(100, drain_queue, log_queue, output_file)
+
+def drain_queue(log_queue, output_file):
+    """Copy pending log messages into the log box; report back once the worker is done or has failed."""
+    while True:
+        try:
+            record = log_queue.get_nowait()
+        except queue.Empty:
+            break
+
+        if record is SCRAPE_DONE:
+            btn_start.config(state=tk.NORMAL)
+            messagebox.showinfo("Done", f"Scraping completed. Updated feed saved to:\n{output_file}")
+            return
+        if record is SCRAPE_FAILED:
+            btn_start.config(state=tk.NORMAL)
+            messagebox.showerror("Scraping Failed", "Scraping stopped with an error. See the log for details.")
+            return
+
+        # QueueHandler has already formatted the record into its message
+        txt_log.insert(tk.END, record.getMessage() + "\n")
+        txt_log.see(tk.END)
+
+    root.after(100, drain_queue, log_queue, output_file)
 
 
 if __name__ == "__main__":
@@ -181,7 +925,8 @@ if __name__ == "__main__":
     # Variables for storing user input
     input_file_var = tk.StringVar(value="original_feed.xml")
     output_file_var = tk.StringVar(value="updated_feed.xml")
-    delay_var = tk.StringVar(value="3")  # default 3 seconds
+    rate_var = tk.StringVar(value="0.33")  # default ~1 request every 3 seconds per host
+    verbose_var = tk.BooleanVar(value=False)
     user_agent_var = tk.StringVar(
         value="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
               "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -208,11 +953,11 @@ if __name__ == "__main__":
     btn_browse_output = tk.Button(frm, text="Browse...", command=browse_output_file)
     btn_browse_output.grid(row=1, column=2, padx=5, pady=5)
 
-    # Delay
-    lbl_delay = tk.Label(frm, text="Delay (seconds):")
-    lbl_delay.grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
-    ent_delay = tk.Entry(frm, textvariable=delay_var, width=10)
-    ent_delay.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+    # Rate
+    lbl_rate = tk.Label(frm, text="Rate (requests/sec per host):")
+    lbl_rate.grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
+    ent_rate = tk.Entry(frm, textvariable=rate_var, width=10)
+    ent_rate.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
 
     # User-Agent
     lbl_user_agent = tk.Label(frm, text="User-Agent:")
@@ -220,8 +965,21 @@ if __name__ == "__main__":
     txt_user_agent = tk.Entry(frm, textvariable=user_agent_var, width=50)
     txt_user_agent.grid(row=3, column=1, columnspan=2, padx=5, pady=5, sticky=tk.W+tk.E)
 
+    # Verbose logging
+    chk_verbose = tk.Checkbutton(frm, text="Verbose (debug) logging", variable=verbose_var)
+    chk_verbose.grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
+
     # Start button
     btn_start = tk.Button(frm, text="Start Scraping", command=start_scraping)
-    btn_start.grid(row=4, column=0, columnspan=3, pady=10)
+    btn_start.grid(row=5, column=0, columnspan=3, pady=10)
+
+    # Log output
+    txt_log = tk.Text(frm, width=80, height=20, wrap=tk.NONE)
+    txt_log.grid(row=6, column=0, columnspan=3, padx=5, pady=5, sticky=tk.NSEW)
+    scr_log = tk.Scrollbar(frm, command=txt_log.yview)
+    scr_log.grid(row=6, column=3, sticky=tk.NS, pady=5)
+    txt_log.config(yscrollcommand=scr_log.set)
+    frm.rowconfigure(6, weight=1)
+    frm.columnconfigure(1, weight=1)
 
     root.mainloop()
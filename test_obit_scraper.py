@@ -0,0 +1,150 @@
+"""
+Checks that the regex fast path in parse_obit_html agrees with the Lexbor
+path: on every fixture page it must either fall back (return None) or give
+the same HTML as _parse_obit_html_lexbor. Also checks that scraped HTML
+always ends up as a valid <description>, and that the feed is streamed
+back out whole.
+
+Run with: python -m pytest test_obit_scraper.py
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import pytest
+from lxml import etree as ET
+from selectolax.lexbor import LexborHTMLParser
+
+import obit_scraper
+
+# Page name -> (page markup, whether the fast path is expected to handle it)
+PAGES = {
+    'basic': (
+        '<div data-blog-component="subtitle"><h3> Jane &amp; Doe </h3></div>'
+        '<div data-blog-component="image"><img alt="" src="http://x/a.jpg?a=1&amp;b=2"></div>'
+        '<div data-blog-component="text"><div data-blog-inner="text"><p>Hi<br>there</p></div></div>'
+        '<div data-blog-component="other"><div>x</div></div>',
+        True
+    ),
+    'subtitle_without_h3': (
+        '<div data-blog-component="subtitle"><p>no</p></div><h3>Page heading</h3>',
+        True
+    ),
+    'uppercase_h3': ('<div data-blog-component="subtitle"><H3>Name</H3></div>', True),
+    'uppercase_img': ('<div data-blog-component="image"><IMG SRC="a.jpg"></div>', True),
+    'gt_in_attribute': ('<div data-blog-component="image"><img alt="a > b" src="a.jpg"></div>', True),
+    'spaced_src': ('<div data-blog-component="image"><img src = "a.jpg"></div>', True),
+    # Legacy entities without ';' stay as written in attributes when a
+    # letter, digit or '=' follows
+    'legacy_entities_in_src': (
+        '<div data-blog-component="image"><img src="x.jpg?w=1&region=us&copy=2&not=3"></div>',
+        True
+    ),
+    'mixed_entities_in_src': (
+        '<div data-blog-component="image"><img src="a&copy b&amp=1&#116;&#x74x&notit;&lt9&gt"></div>',
+        True
+    ),
+    'entity_in_block_type': (
+        '<div data-blog-component="&#116;ext"><div data-blog-inner="text">t</div></div>'
+        '<div data-blog-component="sub&#116itle"><h3>Name</h3></div>',
+        True
+    ),
+    'data_src_only': ('<div data-blog-component="image"><img data-src="x"></div>', True),
+    'uppercase_inner_div': (
+        '<div data-blog-component="text"><DIV data-blog-inner="text">t</DIV></div>',
+        True
+    ),
+    'commented_block': (
+        '<!-- <div data-blog-component="subtitle"><h3>Old</h3></div> -->'
+        '<div data-blog-component="subtitle"><h3>New</h3></div>',
+        False
+    ),
+    'commented_h3': ('<div data-blog-component="subtitle"><!-- <h3>X</h3> --><h3>Y</h3></div>', False),
+    'unclosed_p': (
+        '<div data-blog-component="text"><div data-blog-inner="text"><p>a<p>b</div></div>',
+        False
+    ),
+    'nested_text_div': (
+        '<div data-blog-component="text"><div data-blog-inner="text"><div>a</div>b</div></div>',
+        False
+    ),
+    'single_quoted_block': ("<div data-blog-component='text'><div data-blog-inner='text'>t</div></div>", False),
+    'markup_in_h3': ('<div data-blog-component="subtitle"><h3><span>A</span> B</h3></div>', False),
+    'block_in_script': (
+        '<script>var s = \'<div data-blog-component="subtitle"><h3>X</h3></div>\';</script>',
+        False
+    ),
+    'no_blocks': ('<p>nothing</p>', True),
+}
+
+
+def normalize(block_html):
+    """Re-serialize through Lexbor so equivalent markup compares equal."""
+    return LexborHTMLParser(block_html).body.html if block_html else ''
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_fast_path_matches_lexbor(name):
+    page, fast_expected = PAGES[name]
+    fast = obit_scraper._parse_obit_html_fast(page)
+
+    assert (fast is not None) == fast_expected
+    if fast is not None:
+        assert normalize(fast) == normalize(obit_scraper._parse_obit_html_lexbor(page))
+
+
+@pytest.fixture(scope='module')
+def process_pool():
+    """A worker pool set up like the one scrape_rss_feed_async uses."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize('name', PAGES)
+def test_parse_obit_html_matches_lexbor(name, process_pool):
+    page, _ = PAGES[name]
+    obit_html = asyncio.run(obit_scraper.parse_obit_html(page, process_pool))
+    assert normalize(obit_html) == normalize(obit_scraper._parse_obit_html_lexbor(page))
+
+
+@pytest.mark.parametrize('obit_html', [
+    '<div data-blog-inner="text"><p>Page\x0cbreak\x00</p></div>',
+    '<div data-blog-inner="text"><p>a ]]> b\x0b</p></div>',
+])
+def test_set_description_drops_invalid_xml_characters(obit_html):
+    item = ET.Element('item')
+    obit_scraper.set_description(item, obit_html)
+
+    written = ET.fromstring(ET.tostring(item))
+    assert written.findtext('description') == obit_html.translate(dict.fromkeys((0, 0x0b, 0x0c)))
+
+
+def test_write_rss_feed_streams_whole_feed(tmp_path, monkeypatch):
+    monkeypatch.setattr(obit_scraper, 'FEED_WINDOW', 1)
+    input_file = tmp_path / 'in.xml'
+    input_file.write_text(
+        '<?xml version="1.0"?>\n<rss version="2.0">\n  <channel>\n    <!-- kept -->\n    <?pi kept?>\n'
+        '    <item><link>http://x/a#1</link></item>\n'
+        '    <item><link>HTTP://x/a</link></item>\n'
+        '    <item><link>http://x/b</link></item>\n'
+        '  </channel>\n</rss>\n'
+    )
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+        return f'<p>{url}</p>'
+
+    async def write(output_file):
+        events = obit_scraper.iter_rss(str(input_file))
+        head = obit_scraper.read_rss_head(events)
+        return await obit_scraper.write_rss_feed(output_file, events, head, fetch)
+
+    output_file = str(tmp_path / 'out.xml')
+    assert asyncio.run(write(output_file)) == (3, 1)
+    assert fetched == ['http://x/a', 'http://x/b']
+
+    channel = ET.parse(output_file).getroot().find('channel')
+    assert [str(node) for node in channel if not isinstance(node.tag, str)] == ['<!-- kept -->', '<?pi kept?>']
+    assert [item.findtext('description') for item in channel.iter('item')] == \
+        ['<p>http://x/a</p>', '<p>http://x/a</p>', '<p>http://x/b</p>']